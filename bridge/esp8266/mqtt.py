@@ -11,6 +11,7 @@ import ubinascii
 from mqtt_as import MQTTClient, config
 from machine import Pin, unique_id, freq
 import uasyncio as asyncio
+from micropython import const
 gc.collect()
 from network import WLAN, STA_IF, AP_IF
 import usocket as socket
@@ -20,12 +21,24 @@ gc.collect()
 import ustruct as struct
 from status_values import *  # Numeric status values shared with user code.
 
-_WIFI_DELAY = 15  # Time (s) to wait for default network
+_WIFI_DELAY = const(15)  # Time (s) to wait for default network
 blue = Pin(2, Pin.OUT, value = 1)
 
 # Format an arbitrary list of positional args as a status_values.SEP separated string
 def argformat(*a):
-    return SEP.join(['{}' for x in range(len(a))]).format(*a)
+    return SEP.join(x if isinstance(x, str) else str(x) for x in a)
+
+# Constant status messages, formatted once.
+_MSG_WIFI_UP = argformat(STATUS, WIFI_UP)
+_MSG_WIFI_DOWN = argformat(STATUS, WIFI_DOWN)
+_MSG_PUBOK = argformat(STATUS, PUBOK)
+_MSG_WILLOK = argformat(STATUS, WILLOK)
+_MSG_DEFNET = argformat(STATUS, DEFNET)
+_MSG_SPECNET = argformat(STATUS, SPECNET)
+_MSG_BROKER_CHECK = argformat(STATUS, BROKER_CHECK)
+_MSG_BROKER_FAIL = argformat(STATUS, BROKER_FAIL)
+_MSG_BROKER_OK = argformat(STATUS, BROKER_OK)
+_MSG_RUNNING = argformat(STATUS, RUNNING)
 
 async def heartbeat():
     led = Pin(0, Pin.OUT)
@@ -35,6 +48,8 @@ async def heartbeat():
 
 
 class Client(MQTTClient):
+    _NTP_QUERY = b'\x1b' + bytes(47)  # Constant NTP request packet
+
     def __init__(self, channel, config):
         self.channel = channel
         self.subscriptions = {}
@@ -59,8 +74,6 @@ class Client(MQTTClient):
         # (date(2000, 1, 1) - date(1900, 1, 1)).days * 24*60*60
         NTP_DELTA = 3155673600
         host = self.timeserver
-        NTP_QUERY = bytearray(48)
-        NTP_QUERY[0] = 0x1b
         t = 0
         async with self.lock:
             addr = socket.getaddrinfo(host, 123)[0][-1]  # Blocks 15s if no internet
@@ -68,10 +81,11 @@ class Client(MQTTClient):
             s.setblocking(False)
             try:
                 s.connect(addr)
-                await self._as_write(NTP_QUERY, 48, s)
-                await asyncio.sleep(2)
+                await self._as_write(self._NTP_QUERY, 48, s)
+                # Nonblocking read polls until the reply arrives or response_time
+                # elapses.
                 msg = await self._as_read(48, s)
-                val = struct.unpack("!I", msg[40:44])[0]
+                val = struct.unpack_from("!I", msg, 40)[0]
                 t = val - NTP_DELTA
             except OSError:
                 pass
@@ -83,19 +97,19 @@ class Client(MQTTClient):
         return t
 
     async def wifi_han(self, state):
-        if state:
-            self.channel.send(argformat(STATUS, WIFI_UP))
-        else:
-            self.channel.send(argformat(STATUS, WIFI_DOWN))
+        self.channel.send(_MSG_WIFI_UP if state else _MSG_WIFI_DOWN)
         blue(not state)
         await asyncio.sleep(1)
+        gc.collect()  # Reclaim garbage from the outage/reconnect
 
     async def conn_han(self, _):
         for topic, qos in self.subscriptions.items():
             await self.subscribe(topic, qos)
 
+    # Called for every incoming message: build the frame in a single join.
     def subs_cb(self, topic, msg, retained):
-        self.channel.send(argformat(SUBSCRIPTION, topic.decode('UTF8'), msg.decode('UTF8'), retained))
+        self.channel.send(SEP.join((SUBSCRIPTION, topic.decode('UTF8'),
+                                    msg.decode('UTF8'), str(retained))))
 
 class Channel(SynCom):
     def __init__(self):
@@ -106,40 +120,57 @@ class Channel(SynCom):
         super().__init__(True, mckin, mckout, mrx, mtx, string_mode = True)
         self.cstatus = False  # Connection status
         self.client = None
+        # Handlers for Pyboard commands. Each is passed the field string
+        # following the command.
+        self._handlers = {PUBLISH : self._do_publish,
+                          SUBSCRIBE : self._do_subscribe,
+                          MEM : self._do_mem,
+                          TIME : self._do_time,
+                          }
+
+    async def _do_publish(self, args):
+        topic, msg, retain, qos = args.split(SEP, 3)
+        await self.client.publish(topic, msg, bool(retain), int(qos))
+        # If qos == 1 only returns once PUBACK received.
+        self.send(_MSG_PUBOK)
+
+    async def _do_subscribe(self, args):
+        topic, qos = args.split(SEP, 1)
+        qos = int(qos)
+        await self.client.subscribe(topic, qos)
+        self.client.subscriptions[topic] = qos  # re-subscribe after outage
+
+    async def _do_mem(self, _):
+        gc.collect()
+        self.send(argformat(MEM, gc.mem_free(), gc.mem_alloc()))
+
+    async def _do_time(self, _):
+        t = await self.client.get_time()
+        self.send(argformat(TIME, t))
 
 # Task runs continuously. Process incoming Pyboard messages.
 # Started by main_task() after client instantiated.
     async def from_pyboard(self):
-        client = self.client
+        handlers = self._handlers
         while True:
-            istr = await self.await_obj(20)  # wait for string (poll interval 20ms)
-            s = istr.split(SEP)
-            command = s[0]
-            if command == PUBLISH:
-                await client.publish(s[1], s[2], bool(s[3]), int(s[4]))
-                # If qos == 1 only returns once PUBACK received.
-                self.send(argformat(STATUS, PUBOK))
-            elif command == SUBSCRIBE:
-                await client.subscribe(s[1], int(s[2]))
-                client.subscriptions[s[1]] = int(s[2])  # re-subscribe after outage
-            elif command == MEM:
-                gc.collect()
-                gc.threshold(gc.mem_free() // 4 + gc.mem_alloc())
-                self.send(argformat(MEM, gc.mem_free(), gc.mem_alloc()))
-            elif command == TIME:
-                t = await client.get_time()
-                self.send(argformat(TIME, t))
-            else:
+            istr = await self.await_obj()  # wait for string
+            # Extract the command only: handlers split the fields they use.
+            i = istr.find(SEP)
+            command = istr[:i] if i >= 0 else istr
+            handler = handlers.get(command)
+            if handler is None:
                 self.send(argformat(STATUS, UNKNOWN, 'Unknown command:', istr))
+            else:
+                await handler(istr[i + 1:] if i >= 0 else '')
 
 # Runs when channel has synchronised. No return: Pyboard resets ESP on fail.
 # Get parameters from Pyboard. Process them. Connect. Instantiate client. Start
-# from_pyboard() task. Wait forever, updating connected status.
+# from_pyboard() task. Wait forever.
     async def main_task(self, _):
         got_params = False
         # Await connection parameters (init record)
         while not got_params:
-            istr = await self.await_obj(100)
+            istr = await self.await_obj()
             ilst = istr.split(SEP)
             command = ilst[0]
             if command == 'init':
@@ -162,7 +193,7 @@ class Channel(SynCom):
                 config['timeserver'] = ilst[17]
             elif command == WILL:
                 config['will'] = (ilst[1:3] + [bool(ilst[3])] + [int(ilst[4])])
-                self.send(argformat(STATUS, WILLOK))
+                self.send(_MSG_WILLOK)
             else:
                 self.send(argformat(STATUS, UNKNOWN, 'Expected init, got: ', istr))
         # Got parameters
@@ -175,7 +206,7 @@ class Channel(SynCom):
         # try default LAN if required
         sta_if = WLAN(STA_IF)
         if use_default:
-            self.send(argformat(STATUS, DEFNET))
+            self.send(_MSG_DEFNET)
             secs = _WIFI_DELAY
             while secs >= 0 and not sta_if.isconnected():
                 await asyncio.sleep(1)
@@ -183,9 +214,9 @@ class Channel(SynCom):
 
         # If can't use default, use specified LAN
         if not sta_if.isconnected():
-            self.send(argformat(STATUS, SPECNET))
+            self.send(_MSG_SPECNET)
             # Pause for confirmation. User may opt to reboot instead.
-            istr = await self.await_obj(100)
+            istr = await self.await_obj()
             ap = WLAN(AP_IF) # create access-point interface
             ap.active(False)         # deactivate the interface
             sta_if.active(True)
@@ -193,27 +224,34 @@ class Channel(SynCom):
             while not sta_if.isconnected():
                 await asyncio.sleep(1)
 
-        # WiFi is up: connect to the broker
+        # WiFi is up. Disable modem sleep: it delays incoming broker traffic.
+        # Older firmware lacks the pm option.
+        try:
+            sta_if.config(pm=sta_if.PM_NONE)
+        except (AttributeError, ValueError):
+            pass
+        # Connect to the broker
         await asyncio.sleep(5)  # Let WiFi stabilise before connecting
         self.client = Client(self, config)
-        self.send(argformat(STATUS, BROKER_CHECK))
+        self.send(_MSG_BROKER_CHECK)
         try:
             await self.client.connect()  # Clean session. Throws OSError if broker down.
             # Sends BROKER_OK and RUNNING
         except OSError:
             # Cause Pyboard to reboot us when application requires it.
-            self.send(argformat(STATUS, BROKER_FAIL))
+            self.send(_MSG_BROKER_FAIL)
             while True:
                 await asyncio.sleep(60)  # Twiddle my thumbs. PB will reset me.
 
-        self.send(argformat(STATUS, BROKER_OK))
-        self.send(argformat(STATUS, RUNNING))
+        self.send(_MSG_BROKER_OK)
+        self.send(_MSG_RUNNING)
         # Set channel running
         asyncio.create_task(self.from_pyboard())
+        # Heap use is now near steady state: set the threshold once.
+        gc.collect()
+        gc.threshold(gc.mem_free() // 4 + gc.mem_alloc())
         while True:
-            gc.collect()
-            gc.threshold(gc.mem_free() // 4 + gc.mem_alloc())
-            await asyncio.sleep(1)
+            await asyncio.sleep(60)
 
 # Comms channel to Pyboard
 channel = Channel()
@@ -56,7 +56,7 @@ _DIRE_STATUS = (BROKER_FAIL, UNKNOWN)  # Always fatal
 
 # Format an arbitrary list of positional args as a status_values.SEP separated string
 def argformat(*a):
-    return SEP.join(['{}' for x in range(len(a))]).format(*a)
+    return SEP.join(x if isinstance(x, str) else str(x) for x in a)
 
 def printtime():
     print('{:02d}:{:02d}:{:02d} '.format(localtime()[3], localtime()[4], localtime()[5]), end='')
@@ -329,7 +329,7 @@ class MQTTlink:
             chan_state = channel.any()
             if chan_state is None:  # SynCom Timeout
                 self._evtrun.clear()
-            elif chan_state > 0:
+            while chan_state:  # Drain all queued messages before pausing
                 res = await channel.await_obj()
                 command, action = self.get_cmd(res)
                 if command == SUBSCRIPTION:
@@ -350,6 +350,7 @@ class MQTTlink:
                 else:
                     await s_task(self, UNKNOWN, *s_args)
                     return self.quit('Got unhandled command, resetting ESP8266:', command, action)  # ESP8266 has failed
+                chan_state = channel.any()
 
             await asyncio.sleep_ms(20)
             if not self._evtrun.is_set():  # self.quit() has been called.
@@ -33,7 +33,6 @@
 from utime import ticks_diff, ticks_ms
 import uasyncio as asyncio
 from micropython import const
-import ujson
 
 _BITS_PER_CH = const(7)
 _BITS_SYN = const(8)
@@ -48,6 +47,10 @@ class SynCom:
                  timeout=0, string_mode=False, verbose=True):  # Signal unsupported on rp2
         self.passive = passive
         self.string_mode = string_mode
+        if not string_mode:         # ujson is only loaded if objects are sent
+            import ujson
+            self._dumps = ujson.dumps
+            self._loads = ujson.loads
         self._running = False       # _run coro is down
         self._synchronised = False
         self.verbose = verbose
@@ -62,6 +65,7 @@ class SynCom:
         self._timeout = timeout     # In ms. 0 == No timeout.
         self.lsttx = []             # Queue of strings to send
         self.lstrx = []             # Queue of received strings
+        self._evtrx = asyncio.Event()  # Set on receipt or on stop()
 
 # Start interface and initiate an optional user task. If a timeout and reset
 # signal are specified and the target times out, the target is reset and the
@@ -91,6 +95,7 @@ class SynCom:
 # Can be used to force a failure
     def stop(self):
         self._running = False
+        self._evtrx.set()           # Wake any await_obj() so it can return None
         self.dout(0)
         self.ckout(0)
 
@@ -100,7 +105,7 @@ class SynCom:
         if self.string_mode:
             self.lsttx.append(obj)  # strings are immutable
         else:
-            self.lsttx.append(ujson.dumps(obj))
+            self.lsttx.append(self._dumps(obj))
 
 # Number of queued objects (None on timeout)
     def any(self):
@@ -109,11 +114,14 @@ class SynCom:
 
 # Wait for an object. Return None on timeout.
 # If in string mode returns a string (or None on t/o)
+# Waits on an Event set by the receiver rather than polling. t_ms is retained
+# for compatibility and is unused.
     async def await_obj(self, t_ms=10):
         while self._running:
-            await asyncio.sleep_ms(t_ms)
             if len(self.lstrx):
                 return self.lstrx.pop(0)
+            self._evtrx.clear()
+            await self._evtrx.wait()
 
 # running() is False if the target has timed out.
     def running(self):
@@ -183,9 +191,10 @@ class SynCom:
                         self.lstrx.append(getstr)
                     else:
                         try:
-                            self.lstrx.append(ujson.loads(getstr))
+                            self.lstrx.append(self._loads(getstr))
                         except:     # ujson fail means target has crashed
                             raise SynComError
+                    self._evtrx.set()
                     getstr = ''  # Reset for next string
                     rxidx = 0
 
@@ -30,7 +30,7 @@ def loads(s):
 
 # Format an arbitrary list of positional args as a status_values.SEP separated string
 def argformat(*a):
-    return SEP.join(['{}' for x in range(len(a))]).format(*a)
+    return SEP.join(x if isinstance(x, str) else str(x) for x in a)
 
 async def heartbeat():
     led = Pin(0, Pin.OUT)
@@ -58,7 +58,7 @@ _DIRE_STATUS = (BROKER_FAIL, UNKNOWN)  # Always fatal
 
 # Format an arbitrary list of positional args as a status_values.SEP separated string
 def argformat(*a):
-    return SEP.join(['{}' for x in range(len(a))]).format(*a)
+    return SEP.join(x if isinstance(x, str) else str(x) for x in a)
 
 def printtime():
     print('{:02d}:{:02d}:{:02d} '.format(localtime()[3], localtime()[4], localtime()[5]), end='')